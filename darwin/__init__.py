@@ -8,7 +8,9 @@ __date__ = "20/02/19"
 __license__ = "GPLv3"
 __copyright__ = "Copyright (c) 2019 Advens. All rights reserved."
 
-from .darwinapi import DarwinApi
+import logging
+
+from .darwinapi import DarwinApi, DarwinApiPool
 
 from .darwinexceptions import (
     DarwinInvalidArgumentError,
@@ -17,4 +19,7 @@ from .darwinexceptions import (
     DarwinTimeoutError,
 )
 
-from .darwinprotocol import DarwinPacket
\ No newline at end of file
+from .darwinprotocol import DarwinPacket
+
+# the debug lines are only displayed if the application configures logging
+logging.getLogger(__name__).addHandler(logging.NullHandler())
@@ -10,18 +10,41 @@ __copyright__ = "Copyright (c) 2019 Advens. All rights reserved."
 
 
 # "pip" imports
+import collections
 import ctypes
-import json
+import logging
+import os
+import queue
 import socket
-import time
-import uuid
-from copy import deepcopy
+
+import orjson
 
 # local imports
 from .darwinprotocol import DarwinPacket
 from .darwinexceptions import DarwinInvalidArgumentError, DarwinConnectionError, DarwinTimeoutError
 
 
+logger = logging.getLogger(__name__)
+
+# sizes computed once, as they are needed for every call
+_DARWIN_PACKET_SIZE = ctypes.sizeof(DarwinPacket)
+_UINT_SIZE = ctypes.sizeof(ctypes.c_uint)
+
+# number of certitudes already received with the header: the certitude list starts in the header, where it may be
+# followed by padding bytes, which then hold the next certitudes
+_HEADER_CERTITUDE_COUNT = (_DARWIN_PACKET_SIZE - DarwinPacket.certitude_list_placeholder.offset) // _UINT_SIZE
+
+# maximum number of buffers accepted by a single sendmsg call
+try:
+    _IOV_MAX = os.sysconf("SC_IOV_MAX")
+
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = -1
+
+if _IOV_MAX <= 0:
+    _IOV_MAX = 1024
+
+
 class DarwinApi:
     """
     A class used to call Darwin via a Unix socket or a TCP connection handled by HAProxy.
@@ -35,11 +58,15 @@ class DarwinApi:
     DEFAULT_TIMEOUT : float/None
         the default timeout (expressed in seconds). If None is set, no timeout is active
 
+    DEFAULT_PIPELINE_DEPTH : int
+        the default maximum number of requests sent by darwin.DarwinApi.pipeline_call before reading their responses
+
     socket : socket.socket
         the socket instance used to call Darwin
 
     verbose : bool
-        whether to print debug lines or not
+        whether to emit debug lines or not. Debug lines are emitted on the "darwin" logger, only for the instances
+        created with the verbose mode. The application has to configure logging to display them
 
     Methods
     -------
@@ -49,10 +76,25 @@ class DarwinApi:
     get_filter_code(filter_code)
         Return a filter code from a given filter name. This is case insensitive
 
+    _sendall_buffers(self, buffers)
+        Send several buffers to Darwin, using a single system call when possible
+
+    _recv_into(self, buffer, offset)
+        Fill a preallocated buffer with the bytes received from Darwin, starting at the given offset
+
     low_level_call(self, **kwargs)
         Perform an API call to Darwin, and return the results or the event ID, depending on wheter the call is
         asynchronous or not
 
+    pipeline_call(self, requests, max_pending=DEFAULT_PIPELINE_DEPTH)
+        Send several requests to Darwin in batches, reading the responses of a batch before sending the next one
+
+    _prepare_packet(self, darwin_header, darwin_header_descr, darwin_data, debug)
+        Build the Darwin header and body to be sent for a request
+
+    _recv_response(self, debug)
+        Receive a whole Darwin response: header, certitude list and body
+
     call(self,
          arguments,
          packet_type="other",
@@ -91,6 +133,7 @@ class DarwinApi:
     }
 
     DEFAULT_TIMEOUT = 10
+    DEFAULT_PIPELINE_DEPTH = 32
 
     _SOCKET_PROTOCOL = {
         'unix': (socket.AF_UNIX, socket.SOCK_STREAM),
@@ -112,7 +155,12 @@ class DarwinApi:
             the associated filter code
         """
 
-        return cls.FILTER_CODE_MAP[filter_name.lower()]
+        # the filter name is only lowered when it is not given in its canonical (lowercase) form
+        try:
+            return cls.FILTER_CODE_MAP[filter_name]
+
+        except KeyError:
+            return cls.FILTER_CODE_MAP[filter_name.lower()]
 
     def __init__(self, **kwargs):
         """
@@ -120,7 +168,9 @@ class DarwinApi:
         ----------
         kwargs :
             verbose : bool
-                whether to print debug info or not. Default is False
+                whether to emit debug info or not. Default is False. Debug info of this instance is emitted on the
+                "darwin" logger with the DEBUG level. Nothing is displayed unless the application configures logging,
+                with a handler and the DEBUG level for this logger (e.g. logging.basicConfig(level=logging.DEBUG))
 
             socket_type : str
                 the socket type to be used. "tcp" or "unix" (case insensitive)
@@ -136,10 +186,23 @@ class DarwinApi:
 
             timeout : float/None
                 the timeout (expressed in seconds). If not given, the default timeout is set
+
+            tcp_nodelay : bool
+                if the socket type given is "tcp" or "tcp6", whether to disable Nagle's algorithm (TCP_NODELAY) or not.
+                Default is True
+
+            send_buffer_size : int/None
+                the size (in bytes) of the socket send buffer (SO_SNDBUF). If not given, the system default is kept
+
+            receive_buffer_size : int/None
+                the size (in bytes) of the socket receive buffer (SO_RCVBUF). If not given, the system default is kept
         """
 
         self.verbose = kwargs.get("verbose", False)
 
+        # filter names already resolved to their filter code, as given by the caller
+        self._filter_code_cache = {}
+
         socket_type = kwargs.get("socket_type", None)
 
         try:
@@ -156,7 +219,7 @@ class DarwinApi:
             if connection_info is None:
                 raise DarwinInvalidArgumentError("DarwinApi:: __init__:: No socket path has been given")
             if self.verbose:
-                print("DarwinApi:: __init__:: Connecting to " + str(connection_info) + "...")
+                logger.debug("DarwinApi:: __init__:: Connecting to %s...", connection_info)
 
         elif socket_type in self._SOCKET_PROTOCOL:
             darwin_socket_host = kwargs.get("socket_host", None)
@@ -167,21 +230,78 @@ class DarwinApi:
                 raise DarwinInvalidArgumentError("DarwinApi:: __init__:: No socket port has been given")
             connection_info = (darwin_socket_host, darwin_socket_port)
             if self.verbose:
-                print("DarwinApi:: __init__:: Connecting to {darwin_socket_host}: {darwin_socket_port}...".format(
-                    darwin_socket_host=darwin_socket_host,
-                    darwin_socket_port=darwin_socket_port,
-                ))
+                logger.debug("DarwinApi:: __init__:: Connecting to %s: %s...", darwin_socket_host, darwin_socket_port)
         else :
             raise DarwinInvalidArgumentError("DarwinApi:: __init__:: Unknown socket_type provided")
 
         try:
             self.socket = socket.socket(*self._SOCKET_PROTOCOL[socket_type])
-            self.socket.setblocking(False)
             self.socket.settimeout(darwin_timeout)
+
+            # Darwin calls are small request/response exchanges: Nagle's algorithm would only delay them
+            if socket_type != "unix" and kwargs.get("tcp_nodelay", True):
+                self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            send_buffer_size = kwargs.get("send_buffer_size", None)
+            if send_buffer_size is not None:
+                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, send_buffer_size)
+
+            receive_buffer_size = kwargs.get("receive_buffer_size", None)
+            if receive_buffer_size is not None:
+                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer_size)
+
             self.socket.connect(connection_info)
         except socket.error as error:
             raise DarwinConnectionError(str(error))
 
+    def _sendall_buffers(self, buffers):
+        """
+        Parameters
+        ----------
+        buffers : list
+            the objects supporting the buffer protocol (darwin.DarwinPacket headers, bytes...) to send to Darwin, in
+            order
+        """
+
+        views = [memoryview(buffer).cast("B") for buffer in buffers]
+
+        try:
+            while views:
+                # sendmsg fails when given more than _IOV_MAX buffers
+                bytes_sent = self.socket.sendmsg(views[:_IOV_MAX])
+
+                # drops what has already been sent, in case of a partial send
+                while views and bytes_sent >= len(views[0]):
+                    bytes_sent -= len(views.pop(0))
+
+                if views:
+                    views[0] = views[0][bytes_sent:]
+
+        except socket.timeout as error:
+            raise DarwinTimeoutError(str(error))
+
+    def _recv_into(self, buffer, offset):
+        """
+        Parameters
+        ----------
+        buffer : bytearray
+            the preallocated buffer to fill with the bytes received from Darwin
+
+        offset : int
+            the position in the buffer from which the bytes received will be written
+        """
+
+        with memoryview(buffer) as view:
+            while offset < len(buffer):
+                # MSG_WAITALL lets the kernel wait for the whole buffer on blocking sockets. With a timeout set, the
+                # socket is non-blocking and recv_into may still return less: the loop takes care of it
+                bytes_received = self.socket.recv_into(view[offset:], 0, socket.MSG_WAITALL)
+
+                if bytes_received == 0:
+                    raise DarwinConnectionError("DarwinApi:: _recv_into:: Connection closed by Darwin")
+
+                offset += bytes_received
+
     def low_level_call(self, **kwargs):
         """
         Parameters
@@ -209,156 +329,239 @@ class DarwinApi:
             key. If the call is asynchronous, the event ID is returned
         """
 
-        if self.verbose:
-            print("DarwinApi:: low_level_call:: Sending message to Darwin...")
+        # checked once, so that nothing is formatted for the debug lines when they are not emitted
+        debug = self.verbose and logger.isEnabledFor(logging.DEBUG)
 
-        darwin_header = kwargs.get("header", None)
-        darwin_data = kwargs.get("data", None)
-        #
-        # The 'indent' parameter is set to add '\n' in the json.
-        # For more details, please see l.274.
-        #
-        darwin_body = json.dumps(darwin_data, indent=2)
+        if debug:
+            logger.debug("DarwinApi:: low_level_call:: Sending message to Darwin...")
 
-        if darwin_header is None:
-            darwin_header_descr = kwargs.get("header_descr", None)
+        darwin_header, darwin_body = self._prepare_packet(kwargs.get("header", None),
+                                                          kwargs.get("header_descr", None),
+                                                          kwargs.get("data", None),
+                                                          debug)
 
-            if darwin_header_descr is None:
-                raise DarwinInvalidArgumentError("DarwinApi:: low_level_call:: No header nor description header given")
+        try:
+            # the header and the body are sent together, with as few system calls as possible
+            self._sendall_buffers([darwin_header, darwin_body])
+
+            if darwin_header.response_type == DarwinPacket.RESPONSE_TYPE["back"] or \
+               darwin_header.response_type == DarwinPacket.RESPONSE_TYPE["both"]:
+                response, body = self._recv_response(debug)
+
+                return {
+                    "certitude_list": response.get_python_descr()["certitude_list"],
+                    "body": body
+                }
 
-            event_id = uuid.uuid4().hex
+            return bytes(darwin_header.event_id).hex()
 
-            if self.verbose:
-                print("DarwinApi:: low_level_call:: UUID computed: {event_id} ".format(
-                    event_id=event_id,
-                ))
+        except Exception as error:
+            logger.error("DarwinApi:: low_level_call:: Something wrong happened while calling the Darwin filter")
+            raise error
+
+    def pipeline_call(self, requests, max_pending=DEFAULT_PIPELINE_DEPTH):
+        """
+        Parameters
+        ----------
+        requests : list
+            the requests to send to Darwin. Each request is a dict which takes the same keyword arguments as the
+            darwin.DarwinApi.low_level_call method ("header" or "header_descr", and "data"). Requests sharing the
+            same event ID (e.g. headers created without one, or the same header object given for several requests)
+            get their responses in the order Darwin sends them
+
+        max_pending : int
+            the maximum number of requests sent before their responses are read. Default is
+            darwin.DarwinApi.DEFAULT_PIPELINE_DEPTH
+
+        Returns
+        -------
+        list
+            for each request, in the same order, the Darwin results or the event ID, as returned by the
+            darwin.DarwinApi.low_level_call method
+        """
 
-            darwin_header_descr["event_id"] = event_id
-            darwin_header = DarwinPacket(verbose=self.verbose, **darwin_header_descr)
+        debug = self.verbose and logger.isEnabledFor(logging.DEBUG)
+
+        if debug:
+            logger.debug("DarwinApi:: pipeline_call:: Sending %s messages to Darwin...", len(requests))
+
+        # each request is sent as two buffers (its header and its body)
+        batch_size = max(1, min(max_pending, _IOV_MAX // 2))
+        results = []
 
         try:
-            darwin_packet_len = ctypes.sizeof(DarwinPacket) + ctypes.sizeof(ctypes.c_uint) * (len(darwin_data) - 1)
-            if self.verbose:
-                print("DarwinApi:: low_level_call:: Size of a Darwin packet: {darwin_packet_len} byte(s)".format(
-                    darwin_packet_len=darwin_packet_len,
-                ))
+            for batch_start in range(0, len(requests), batch_size):
+                darwin_buffers = []
+                # several requests may share the same event ID (e.g. headers given without one): the indices of the
+                # requests waiting for a response are kept by event ID, in the order they are sent
+                pending_results = collections.defaultdict(collections.deque)
+                pending_count = 0
+
+                for request in requests[batch_start:batch_start + batch_size]:
+                    darwin_header, darwin_body = self._prepare_packet(request.get("header", None),
+                                                                      request.get("header_descr", None),
+                                                                      request.get("data", None),
+                                                                      debug)
+                    # the header is only sent once the whole batch is ready: a copy is kept, so that a header object
+                    # given for several requests goes out with the body size of each of them
+                    darwin_header = DarwinPacket.from_buffer_copy(darwin_header)
+                    darwin_buffers.append(darwin_header)
+                    darwin_buffers.append(darwin_body)
+
+                    event_id = bytes(darwin_header.event_id).hex()
+                    results.append(event_id)
+
+                    if darwin_header.response_type == DarwinPacket.RESPONSE_TYPE["back"] or \
+                       darwin_header.response_type == DarwinPacket.RESPONSE_TYPE["both"]:
+                        pending_results[event_id].append(len(results) - 1)
+                        pending_count += 1
+
+                # the requests of a batch are sent before any response is read, so that Darwin can process them back
+                # to back. Their responses are all read before the next batch is sent: otherwise, Darwin could stop
+                # reading the requests while waiting for its responses to be read, and both sides would be blocked
+                self._sendall_buffers(darwin_buffers)
+
+                # the responses are bound to their request with their event ID, whatever the order they come in. The
+                # responses sharing an event ID are bound to their requests in order
+                for _ in range(pending_count):
+                    response, body = self._recv_response(debug)
+                    event_id = bytes(response.event_id).hex()
+                    pending_indices = pending_results.get(event_id, None)
+
+                    if not pending_indices:
+                        raise DarwinConnectionError("DarwinApi:: pipeline_call:: Darwin sent a response for an "
+                                                    "unknown event ID ({event_id})".format(event_id=event_id))
+
+                    results[pending_indices.popleft()] = {
+                        "certitude_list": response.get_python_descr()["certitude_list"],
+                        "body": body
+                    }
 
-            if darwin_body is not None:
-                darwin_header.body_size = len(darwin_body) + 1 # See l. 274
+            return results
 
-            else:
-                darwin_header.body_size = 0
+        except Exception as error:
+            logger.error("DarwinApi:: pipeline_call:: Something wrong happened while calling the Darwin filter")
+            raise error
 
-            if self.verbose:
-                print("DarwinApi:: low_level_call:: Body size in the Darwin header set to {body_size}".format(
-                    body_size=darwin_header.body_size,
-                ))
-
-                print("DarwinApi:: low_level_call:: Sending header to Darwin...")
-
-                print("DarwinApi:: low_level_call:: Header description: {header_descr}".format(
-                    header_descr=darwin_header.get_python_descr()
-                ))
-
-            self.socket.sendall(darwin_header)
-
-            if darwin_body is not None:
-                #
-                # This '\n' is added to make sure the packets are correctly forwarded to Darwin with all TCP forwarder.
-                # This addition does not interfere with the json parsing made by Darwin.
-                #
-                # Some TCP forwarder are holding on the TCP packet unless the packet contains a newline '\n'.
-                # This behavior was observed with :
-                #   - HAProxy 2.2.5
-                #
-                darwin_body += '\n'
-                if self.verbose:
-                    print("DarwinApi:: low_level_call:: Sending body \"{darwin_body}\" to Darwin...".format(
-                        darwin_body=darwin_body,
-                    ))
+    def _prepare_packet(self, darwin_header, darwin_header_descr, darwin_data, debug):
+        """
+        Parameters
+        ----------
+        darwin_header : darwin.DarwinPacket/None
+            the darwin.DarwinPacket header instance to be sent to Darwin. If None, a header description has to be
+            provided
 
-                self.socket.sendall(darwin_body.encode("utf-8"))
+        darwin_header_descr : dict/None
+            the Darwin header description to create a darwin.DarwinPacket header instance, if no header is given
 
-            else:
-                if self.verbose:
-                    print("DarwinApi:: low_level_call:: No body provided")
+        darwin_data : list
+            the arguments to send to Darwin
 
-            if darwin_header.response_type == DarwinPacket.RESPONSE_TYPE["back"] or \
-               darwin_header.response_type == DarwinPacket.RESPONSE_TYPE["both"]:
-                if self.verbose:
-                    print("DarwinApi:: low_level_call:: Receiving response from Darwin...")
+        debug : bool
+            whether to log debug info or not
 
-                try:
-                    timeout = self.socket.gettimeout()
-
-                    if timeout is not None:
-                        past = time.time()
-
-                    bytes_received = 0
-                    raw_response = b''
-                    if self.verbose:
-                        print("DarwinApi:: low_level_call:: Receiving packet header...")
-                    while bytes_received < ctypes.sizeof(DarwinPacket):
-                        if timeout is not None and time.time() - past > timeout:
-                            raise socket.timeout
-                        raw_response += self.socket.recv(ctypes.sizeof(DarwinPacket) - bytes_received)
-                        bytes_received = len(raw_response)
-                    if self.verbose:
-                        print("DarwinApi:: low_level_call:: Packet header received")
-
-                    response = DarwinPacket(bytes_descr=deepcopy(raw_response), verbose=self.verbose)
-                    certitude_size = response.get_python_descr()["certitude_size"]
-
-                    if certitude_size > response.DEFAULT_CERTITUDE_LIST_SIZE:
-                        if self.verbose:
-                            print("DarwinApi:: low_level_call:: Receiving certitude list of size ({})...".format(certitude_size))
-                        while bytes_received < ctypes.sizeof(DarwinPacket) + ctypes.sizeof(ctypes.c_uint) * (certitude_size - response.DEFAULT_CERTITUDE_LIST_SIZE):
-                            if timeout is not None and time.time() - past > timeout:
-                                raise socket.timeout
-                            raw_response += self.socket.recv(ctypes.sizeof(DarwinPacket) + ctypes.sizeof(ctypes.c_uint) * (certitude_size - response.DEFAULT_CERTITUDE_LIST_SIZE) - bytes_received)
-                            bytes_received = len(raw_response)
-                        if self.verbose:
-                            print("DarwinApi:: low_level_call:: Certitude list received (if exists)")
-                        response = DarwinPacket(bytes_descr=raw_response, verbose=self.verbose)
-
-                    if self.verbose:
-                        print("DarwinApi:: low_level_call:: Receiving body of size {}...".format(response.get_python_descr()["body_size"]))
-                    bytes_received = 0
-                    raw_response = b''
-                    while bytes_received < response.get_python_descr()["body_size"]:
-                        if timeout is not None and time.time() - past > timeout:
-                            raise socket.timeout
-                        raw_response += self.socket.recv(response.get_python_descr()["body_size"] - bytes_received)
-                        bytes_received = len(raw_response)
-                    if self.verbose:
-                        print("DarwinApi:: low_level_call:: Body received")
-
-                except socket.timeout as error:
-                    raise DarwinTimeoutError(str(error))
-
-                certitude_list = response.get_python_descr()["certitude_list"]
-                body = raw_response.decode()
+        Returns
+        -------
+        tuple
+            the darwin.DarwinPacket header, with its body size set, and the body to send, as bytes
+        """
 
-                if self.verbose:
-                    print("DarwinApi:: low_level_call:: Certitude list obtained: {certitude_list}".format(
-                        certitude_list=certitude_list,
-                    ))
+        if darwin_header is None:
+            if darwin_header_descr is None:
+                raise DarwinInvalidArgumentError("DarwinApi:: _prepare_packet:: No header nor description header given")
 
-                if self.verbose:
-                    print("DarwinApi:: low_level_call:: Body obtained: {body}".format(
-                        body=body,
-                    ))
+            # random bytes are directly written in the header: no UUID object nor hexadecimal string is needed
+            event_id_bytes = os.urandom(16)
 
-                return {
-                    "certitude_list": certitude_list,
-                    "body": body
-                }
+            if debug:
+                logger.debug("DarwinApi:: _prepare_packet:: UUID computed: %s ", event_id_bytes.hex())
 
-            return event_id
+            darwin_header_descr["event_id_bytes"] = event_id_bytes
+            darwin_header = DarwinPacket(verbose=debug, **darwin_header_descr)
 
-        except Exception as error:
-            print("DarwinApi:: low_level_call:: Something wrong happened while calling the Darwin filter")
-            raise error
+        #
+        # orjson returns the serialized body as bytes, so it can be sent as is.
+        #
+        # A '\n' is added to make sure the packets are correctly forwarded to Darwin with all TCP forwarder.
+        # This addition does not interfere with the json parsing made by Darwin.
+        #
+        # Some TCP forwarder are holding on the TCP packet unless the packet contains a newline '\n'.
+        # This behavior was observed with :
+        #   - HAProxy 2.2.5
+        #
+        darwin_body = orjson.dumps(darwin_data) + b'\n'
+        darwin_header.body_size = len(darwin_body)
+
+        if debug:
+            darwin_packet_len = _DARWIN_PACKET_SIZE + _UINT_SIZE * (len(darwin_data) - 1)
+            logger.debug("DarwinApi:: _prepare_packet:: Size of a Darwin packet: %s byte(s)", darwin_packet_len)
+
+            logger.debug("DarwinApi:: _prepare_packet:: Body size in the Darwin header set to %s",
+                         darwin_header.body_size)
+
+            logger.debug("DarwinApi:: _prepare_packet:: Header description: %s", darwin_header.get_python_descr())
+
+            logger.debug("DarwinApi:: _prepare_packet:: Body: \"%s\"", darwin_body.decode("utf-8"))
+
+        return darwin_header, darwin_body
+
+    def _recv_response(self, debug):
+        """
+        Parameters
+        ----------
+        debug : bool
+            whether to log debug info or not
+
+        Returns
+        -------
+        tuple
+            the darwin.DarwinPacket response received, with its whole certitude list, and the decoded body
+        """
+
+        if debug:
+            logger.debug("DarwinApi:: _recv_response:: Receiving response from Darwin...")
+
+        try:
+            raw_response = bytearray(_DARWIN_PACKET_SIZE)
+            if debug:
+                logger.debug("DarwinApi:: _recv_response:: Receiving packet header...")
+            self._recv_into(raw_response, 0)
+            if debug:
+                logger.debug("DarwinApi:: _recv_response:: Packet header received")
+
+            response = DarwinPacket(bytes_descr=raw_response, verbose=debug)
+            certitude_size = response.certitude_size
+
+            if certitude_size > response.DEFAULT_CERTITUDE_LIST_SIZE:
+                if debug:
+                    logger.debug("DarwinApi:: _recv_response:: Receiving certitude list of size (%s)...",
+                                 certitude_size)
+                # the certitudes following the ones of the header are received in their own buffer, allocated once
+                raw_certitudes = bytearray(_UINT_SIZE * (certitude_size - response.DEFAULT_CERTITUDE_LIST_SIZE))
+                self._recv_into(raw_certitudes, 0)
+                if debug:
+                    logger.debug("DarwinApi:: _recv_response:: Certitude list received (if exists)")
+                response._parse_certitudes(raw_certitudes, 0, _HEADER_CERTITUDE_COUNT)
+
+            if debug:
+                logger.debug("DarwinApi:: _recv_response:: Receiving body of size %s...", response.body_size)
+            raw_response = bytearray(response.body_size)
+            self._recv_into(raw_response, 0)
+            if debug:
+                logger.debug("DarwinApi:: _recv_response:: Body received")
+
+        except socket.timeout as error:
+            raise DarwinTimeoutError(str(error))
+
+        body = raw_response.decode()
+
+        if debug:
+            logger.debug("DarwinApi:: _recv_response:: Certitude list obtained: %s",
+                         response.get_python_descr()["certitude_list"])
+
+            logger.debug("DarwinApi:: _recv_response:: Body obtained: %s", body)
+
+        return response, body
 
     def call(self,
              arguments,
@@ -407,7 +610,7 @@ class DarwinApi:
                 return results["certitude_list"][0]
             except IndexError:
                 if self.verbose:
-                    print("DarwinApi:: call:: No certitude returned")
+                    logger.debug("DarwinApi:: call:: No certitude returned")
 
                 return None
 
@@ -419,7 +622,7 @@ class DarwinApi:
         """
 
         if self.verbose:
-            print("DarwinApi:: close:: Closing socket")
+            logger.debug("DarwinApi:: close:: Closing socket")
 
         self.socket.close()
 
@@ -458,16 +661,22 @@ class DarwinApi:
             the Darwin results stored in a list
         """
         if isinstance(filter_code, str):
-            try:
-                filter_code = self.get_filter_code(filter_code)
+            filter_name = filter_code
+            filter_code = self._filter_code_cache.get(filter_name)
+
+            if filter_code is None:
+                try:
+                    filter_code = self.get_filter_code(filter_name)
+
+                except KeyError:
+                    raise DarwinInvalidArgumentError("DarwinApi:: call:: The filter code provided "
+                                                     "(\"{filter_code}\") does not exist. "
+                                                     "Accepted values are: {accepted_values}".format(
+                                                         filter_code=filter_name,
+                                                         accepted_values=", ".join(self.FILTER_CODE_MAP.keys()),
+                                                     ))
 
-            except KeyError:
-                raise DarwinInvalidArgumentError("DarwinApi:: call:: The filter code provided "
-                                                 "(\"{filter_code}\") does not exist. "
-                                                 "Accepted values are: {accepted_values}".format(
-                                                     filter_code=filter_code,
-                                                     accepted_values=", ".join(self.FILTER_CODE_MAP.keys()),
-                                                 ))
+                self._filter_code_cache[filter_name] = filter_code
 
         return self.low_level_call(
             header_descr={
@@ -478,3 +687,139 @@ class DarwinApi:
             data=data,
             **kwargs
         )
+
+
+class DarwinApiPool:
+    """
+    A class used to keep several connections to Darwin open, and to lend them to the callers. This avoids paying for a
+    connection to Darwin on every call, when calls are made from short-lived code or from several threads.
+
+    A darwin.DarwinApi instance is not thread-safe: an instance acquired from the pool must only be used by the thread
+    which acquired it, until it is released. The pool itself can be shared by several threads.
+
+    Attributes
+    ----------
+    DEFAULT_SIZE : int
+        the default number of connections kept open by the pool
+
+    size : int
+        the number of connections kept open by the pool
+
+    verbose : bool
+        whether to emit debug lines or not, as the darwin.DarwinApi instances of the pool. Taken from the verbose
+        keyword argument given to create them
+
+    Methods
+    -------
+    __init__(self, size=DEFAULT_SIZE, **kwargs)
+        Create a darwin.DarwinApiPool instance, and open all its connections to Darwin
+
+    acquire(self, timeout=None)
+        Take a darwin.DarwinApi instance from the pool, waiting for one to be released if none is available
+
+    release(self, darwin_api, reconnect=False)
+        Give a darwin.DarwinApi instance back to the pool
+
+    close(self)
+        Close all the connections of the pool
+    """
+
+    DEFAULT_SIZE = 4
+
+    def __init__(self, size=DEFAULT_SIZE, **kwargs):
+        """
+        Parameters
+        ----------
+        size : int
+            the number of connections to keep open. Default is darwin.DarwinApiPool.DEFAULT_SIZE
+
+        kwargs :
+            the keyword arguments used to create each darwin.DarwinApi instance. Please refer to the
+            darwin.DarwinApi.__init__ method documentation
+        """
+
+        if size < 1:
+            raise DarwinInvalidArgumentError("DarwinApiPool:: __init__:: The pool size has to be at least 1")
+
+        self.size = size
+        self.verbose = kwargs.get("verbose", False)
+        self._darwin_api_kwargs = kwargs
+        self._darwin_apis = queue.Queue(maxsize=size)
+
+        try:
+            for _ in range(size):
+                self._darwin_apis.put_nowait(DarwinApi(**kwargs))
+
+        except DarwinConnectionError:
+            self.close()
+            raise
+
+    def acquire(self, timeout=None):
+        """
+        Parameters
+        ----------
+        timeout : float/None
+            the maximum time (expressed in seconds) to wait for a connection to be released. If None, there is no
+            time limit
+
+        Returns
+        -------
+        darwin.DarwinApi
+            a connected darwin.DarwinApi instance, to be given back with darwin.DarwinApiPool.release. If the
+            connection of the slot obtained has to be replaced, a new one is opened; if it cannot be opened, the slot
+            is given back to the pool and the darwin.DarwinConnectionError is raised
+        """
+
+        try:
+            darwin_api = self._darwin_apis.get(timeout=timeout)
+
+        except queue.Empty:
+            raise DarwinTimeoutError("DarwinApiPool:: acquire:: No connection released in time")
+
+        # None marks a slot whose connection was closed on release, to be opened again here
+        if darwin_api is None:
+            try:
+                darwin_api = DarwinApi(**self._darwin_api_kwargs)
+
+            except BaseException:
+                self._darwin_apis.put_nowait(None)
+                raise
+
+        return darwin_api
+
+    def release(self, darwin_api, reconnect=False):
+        """
+        Parameters
+        ----------
+        darwin_api : darwin.DarwinApi
+            the instance previously obtained with darwin.DarwinApiPool.acquire
+
+        reconnect : bool
+            whether to replace the connection by a new one or not. This should be set when a call failed, as the
+            connection may be left in an unknown state. The connection is closed, and the new one is only opened by
+            the next darwin.DarwinApiPool.acquire call on this slot, so that releasing never fails. Default is False
+        """
+
+        if reconnect:
+            darwin_api.close()
+            darwin_api = None
+
+        self._darwin_apis.put_nowait(darwin_api)
+
+    def close(self):
+        """
+        Only the connections currently in the pool are closed: the ones still acquired have to be closed by their user
+        """
+
+        if self.verbose:
+            logger.debug("DarwinApiPool:: close:: Closing the pool connections")
+
+        while True:
+            try:
+                darwin_api = self._darwin_apis.get_nowait()
+
+            except queue.Empty:
+                break
+
+            if darwin_api is not None:
+                darwin_api.close()
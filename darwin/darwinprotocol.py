@@ -11,12 +11,20 @@ __copyright__ = "Copyright (c) 2019 Advens. All rights reserved."
 
 
 # "pip" imports
+import array
 import ctypes
+import logging
 
 # local imports
 from .darwinexceptions import DarwinMaxCertitudeSizeError
 
 
+logger = logging.getLogger(__name__)
+
+# zero-length, hence immutable: can be shared by all the packets without certitudes
+_EMPTY_CERTITUDE_LIST = (ctypes.c_uint * 0)()
+
+
 class DarwinPacket(ctypes.Structure):
     """
     A class used to create a Darwin packet
@@ -52,12 +60,18 @@ class DarwinPacket(ctypes.Structure):
              certitude_list=None,
              certitude_size=0,
              body_size=0,
-             event_id='9fe2c4e93f654fdbb24c02b15259716c', )
+             event_id='9fe2c4e93f654fdbb24c02b15259716c',
+             max_certitude_size=None,
+             verbose=False,
+             event_id_bytes=None, )
         Create a Darwin packet instance
 
     _parse_bytes(self, bytes_descr)
         Used internally when creating a Darwin packet from bytes
 
+    _parse_certitudes(self, bytes_descr, offset=None, first_certitude=0)
+        Used internally to fill the certitude list once all the certitudes have been received
+
     get_python_descr(self)
         Return the header converted to a Python dict object
     """
@@ -91,12 +105,13 @@ class DarwinPacket(ctypes.Structure):
                  packet_type="other",
                  response_type="no",
                  filter_code=DARWIN_FILTER_CODE_NO,
-                 certitude_list=[],
+                 certitude_list=None,
                  certitude_size=0,
                  event_id=32 * "0",
                  body_size=0,
                  max_certitude_size=None,
-                 verbose=False, ):
+                 verbose=False,
+                 event_id_bytes=None, ):
         """
         Parameters
         ----------
@@ -123,19 +138,24 @@ class DarwinPacket(ctypes.Structure):
             a string that represents an UUID, associated with a Darwin call. Useful with asynchronous calls, to bind
             the results
 
+        event_id_bytes: bytes
+            if provided, the 16 raw bytes of the event ID, copied as is in the packet. The event_id argument is then
+            ignored
+
         certitude_size : int
             the number of certitude values returned. Default is 0
 
-        certitude_list : list
-            the Darwin certitude list. Default is []. A certitude has to be superior or equal to 0. If an error occurs,
-            the certitude will be strictly superior to 100
+        certitude_list : list/tuple/array.array
+            the Darwin certitude list. Default is None (no certitude). A certitude has to be superior or equal to 0.
+            If an error occurs, the certitude will be strictly superior to 100. Any iterable of ints is accepted; it
+            is converted in bulk to unsigned ints, and only its first certitude_size values are kept
 
         max_certitude_size : int
             the maximum number of certitudes that can be stored in the darwinprotocol.DarwinPacket object. Default is
             darwinprotocol.DarwinPacket.DEFAULT_MAX_CERTITUDE_SIZE
 
         verbose : bool
-            whether to print debug info or not. Default is False
+            whether to log debug info or not, on the "darwin" logger. Default is False
         """
 
         if max_certitude_size is None:
@@ -145,50 +165,68 @@ class DarwinPacket(ctypes.Structure):
 
         if bytes_descr is not None:
             if verbose:
-                print("DarwinPacket:: __init__:: Creating a Darwin packet from bytes")
+                logger.debug("DarwinPacket:: __init__:: Creating a Darwin packet from bytes")
 
             self._parse_bytes(bytes_descr)
 
             return
 
         if verbose:
-            print("DarwinPacket:: __init__:: Creating a Darwin packet with the parameters:\n"
-                  "\t> packet_type: {packet_type}\n"
-                  "\t> response_type: {response_type}\n"
-                  "\t> filter_code: {filter_code}\n"
-                  "\t> body_size: {body_size}\n"
-                  "\t> event_id: {event_id}\n"
-                  "\t> certitude_size: {certitude_size}\n"
-                  "\t> certitude_list: {certitude_list}".format(
-                      packet_type=packet_type,
-                      response_type=response_type,
-                      filter_code=filter_code,
-                      body_size=body_size,
-                      certitude_size=certitude_size,
-                      certitude_list=certitude_list,
-                      event_id=event_id,
-                  ))
+            logger.debug("DarwinPacket:: __init__:: Creating a Darwin packet with the parameters:\n"
+                         "\t> packet_type: %s\n"
+                         "\t> response_type: %s\n"
+                         "\t> filter_code: %s\n"
+                         "\t> body_size: %s\n"
+                         "\t> event_id: %s\n"
+                         "\t> certitude_size: %s\n"
+                         "\t> certitude_list: %s",
+                         packet_type,
+                         response_type,
+                         filter_code,
+                         body_size,
+                         event_id if event_id_bytes is None else event_id_bytes.hex(),
+                         certitude_size,
+                         certitude_list, )
 
         self.packet_type = ctypes.c_int(int(self.PACKET_TYPE[packet_type]))
         self.response_type = ctypes.c_int(int(self.RESPONSE_TYPE[response_type]))
         self.filter_code = ctypes.c_long(filter_code)
         self.body_size = ctypes.c_size_t(body_size)
-        byte_arr = bytearray.fromhex(event_id)
-        self.event_id = (ctypes.c_ubyte * 16)(*(byte_arr))
+        if event_id_bytes is None:
+            event_id_bytes = bytes.fromhex(event_id)
+
+        ctypes.memmove(self.event_id, event_id_bytes, min(len(event_id_bytes), ctypes.sizeof(self.event_id)))
         self.certitude_size = ctypes.c_size_t(certitude_size)
-        self.certitude_list_placeholder = (ctypes.c_uint * self.DEFAULT_CERTITUDE_LIST_SIZE)(*certitude_list)
-        self.certitude_list = (ctypes.c_uint * self.certitude_size)(*certitude_list)
+
+        # outbound packets rarely carry certitudes: the placeholder is already zeroed, and an empty list is shared
+        if certitude_size == 0:
+            self.certitude_list = _EMPTY_CERTITUDE_LIST
+
+            return
+
+        self.certitude_list = (ctypes.c_uint * self.certitude_size)()
+
+        if certitude_list is not None:
+            # the certitudes are converted in C by array.array, then copied in bulk into the ctypes array
+            certitudes = array.array("I", certitude_list)
+            self.certitude_list_placeholder = (ctypes.c_uint * self.DEFAULT_CERTITUDE_LIST_SIZE)(
+                *certitudes[:self.DEFAULT_CERTITUDE_LIST_SIZE]
+            )
+            ctypes.memmove(
+                self.certitude_list, certitudes.buffer_info()[0],
+                certitudes.itemsize * min(len(certitudes), self.certitude_size)
+            )
 
     def _parse_bytes(self, bytes_descr):
         """
         Parameters
         ----------
-        bytes_descr : bytes
+        bytes_descr : bytes/bytearray
             the bytes which will reconstruct the Darwin packet
         """
 
         fit = min(len(bytes_descr), ctypes.sizeof(self))
-        ctypes.memmove(ctypes.addressof(self), bytes_descr, fit)
+        memoryview(self).cast("B")[:fit] = memoryview(bytes_descr)[:fit]
 
         if self.certitude_size > self.max_certitude_size:
             raise DarwinMaxCertitudeSizeError(
@@ -201,10 +239,31 @@ class DarwinPacket(ctypes.Structure):
 
         self.certitude_list = (ctypes.c_uint * self.certitude_size)()
 
-        ctypes.memmove(
-            ctypes.addressof(self.certitude_list), bytes_descr[DarwinPacket.certitude_list_placeholder.offset:],
-            ctypes.sizeof(ctypes.c_uint) * self.certitude_size
-        )
+        self._parse_certitudes(bytes_descr)
+
+    def _parse_certitudes(self, bytes_descr, offset=None, first_certitude=0):
+        """
+        Parameters
+        ----------
+        bytes_descr : bytes/bytearray
+            the bytes containing the certitudes. By default, the bytes of the whole Darwin packet, which may contain
+            more certitudes than when the packet was created. Only the certitudes available are copied in the
+            certitude list
+
+        offset : int/None
+            the position of the first certitude to copy in bytes_descr. Default is None, which means the position of
+            the certitude list in a Darwin packet
+
+        first_certitude : int
+            the index, in the certitude list, of the first certitude to copy. Default is 0
+        """
+
+        if offset is None:
+            offset = DarwinPacket.certitude_list_placeholder.offset
+
+        start = ctypes.sizeof(ctypes.c_uint) * first_certitude
+        fit = max(0, min(len(bytes_descr) - offset, ctypes.sizeof(self.certitude_list) - start))
+        memoryview(self.certitude_list).cast("B")[start:start + fit] = memoryview(bytes_descr)[offset:offset + fit]
 
     def get_python_descr(self):
         """
@@ -219,9 +278,8 @@ class DarwinPacket(ctypes.Structure):
             "response_type": int(self.response_type),
             "filter_code": int(self.filter_code),
             "body_size": int(self.body_size),
-            "event_id": "".join("{:02x}".format(item) for item in self.event_id),
+            "event_id": bytes(self.event_id).hex(),
             "certitude_size": int(self.certitude_size),
-            "certitude_list": [
-                int(certitude) for certitude in self.certitude_list[:self.certitude_size]
-            ],
+            # slicing a ctypes array already returns a list of Python ints
+            "certitude_list": self.certitude_list[:self.certitude_size],
         }
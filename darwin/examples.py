@@ -10,69 +10,94 @@ __copyright__ = "Copyright (c) 2019 Advens. All rights reserved."
 
 
 from darwin import DarwinApi
+from darwin import DarwinPacket
+
+
+DARWIN_HOST = "10.59.10.28"
+
+
+def get_darwin_api(darwin_apis, socket_host, socket_port):
+    """
+    Return the connection already opened to the given host and port, or open it. This way, successive calls to the
+    same filter reuse the same connection instead of connecting again each time
+    """
+
+    try:
+        return darwin_apis[(socket_host, socket_port)]
+
+    except KeyError:
+        darwin_api = DarwinApi(
+            socket_host=socket_host,
+            socket_port=socket_port,
+            socket_type="tcp",
+            timeout=1,
+            tcp_nodelay=True,
+        )
+
+        darwin_apis[(socket_host, socket_port)] = darwin_api
+
+        return darwin_api
 
 
 if __name__ == "__main__":
-    darwin_api = DarwinApi(
-        socket_host="10.59.10.28",
-        socket_port=8006,
-        socket_type="tcp",
-        timeout=1,
-    )
+    darwin_apis = {}
 
-    darwin_api.call(
+    get_darwin_api(darwin_apis, DARWIN_HOST, 8006).call(
         ["google.com"],
         filter_code="DGA",
         response_type="back",
     )
 
-    darwin_api.close()
-
-    darwin_api = DarwinApi(
-        socket_host="10.59.10.28",
-        socket_port=8007,
-        socket_type="tcp",
-    )
-
-    darwin_api.call(
+    get_darwin_api(darwin_apis, DARWIN_HOST, 8007).call(
         ["Mozilla/5.0 (iPad; U; CPU OS 3_2_1 like Mac OS X; en-us) "
          "AppleWebKit/531.21.10 (KHTML, like Gecko) Mobile/7B405"],
         filter_code="UserAgent",
         response_type="back",
     )
 
-    darwin_api.close()
-
-    darwin_api = DarwinApi(
-        socket_host="10.59.10.28",
-        socket_port=8006,
-        socket_type="tcp",
-    )
-
-    darwin_api.call(
+    get_darwin_api(darwin_apis, DARWIN_HOST, 8006).call(
         ["google.com"],
         filter_code="DGA",
         response_type="back",
     )
 
-    darwin_api.close()
-
-    darwin_api = DarwinApi(
-        socket_host="10.59.10.28",
-        socket_port=8008,
-        socket_type="tcp",
-    )
-
-    darwin_api.call(
-        ["5.187.0.137", "attack;tor"],
-        filter_code="Reputation",
-        response_type="back",
-    )
-
-    darwin_api.call(
-        ["192.168.1.42", "attack;tor"],
+    # both requests are sent in a single call: the certitudes are returned in the same order, in "certitude_list"
+    get_darwin_api(darwin_apis, DARWIN_HOST, 8008).bulk_call(
+        [
+            ["5.187.0.137", "attack;tor"],
+            ["192.168.1.42", "attack;tor"],
+        ],
         filter_code="Reputation",
         response_type="back",
     )
 
-    darwin_api.close()
+    # independent requests are sent back to back, without waiting for each response: the results are returned in the
+    # same order as the requests
+    get_darwin_api(darwin_apis, DARWIN_HOST, 8006).pipeline_call([
+        {
+            "header_descr": {"filter_code": DarwinApi.get_filter_code("DGA"), "response_type": "back"},
+            "data": [[domain_name]],
+        }
+        for domain_name in ("google.com", "example.com", "1jd1d0w9dsaj10245dsaf.tk", )
+    ])
+
+    # the headers can also be built beforehand. Without an event ID, they all share the default one: the responses are
+    # then bound to their request in the order Darwin sends them
+    get_darwin_api(darwin_apis, DARWIN_HOST, 8007).pipeline_call([
+        {
+            "header": DarwinPacket(
+                packet_type="other",
+                response_type="back",
+                filter_code=DarwinApi.get_filter_code("UserAgent"),
+            ),
+            "data": [[user_agent]],
+        }
+        for user_agent in (
+            "Opera/9.60 (Windows NT 6.0; U; en) Presto/2.1.1",
+            "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/51.0.2704.103 "
+            "Safari/537.36",
+        )
+    ])
+
+    for darwin_api in darwin_apis.values():
+        darwin_api.close()
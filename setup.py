@@ -10,6 +10,6 @@ setup(
     license="GPLv3",
     packages=["darwin"],
     dependency_links=[],
-    install_requires=[],
+    install_requires=["orjson"],
     zip_safe=False
 )
@@ -11,17 +11,52 @@ __copyright__ = "Copyright (c) 2019 Advens. All rights reserved."
 
 # system/pip imports
 import argparse
+import atexit
+import dataclasses
+import functools
+import io
+import logging
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Darwin imports
+from tests_descr import MISSING
 from tests_descr import TESTS_DESCR
 from darwin import DarwinApi
+from darwin import DarwinPacket
 from darwin import DarwinConnectionError
 
 
 MODULE_NAME = sys.argv[0][:-3]
 
+# monotonic, nanosecond resolution clock, looked up once
+perf_counter_ns = time.perf_counter_ns
+
+# maximum number of tests run at the same time
+MAX_WORKERS = 32
+
+# held while the buffered output of a test is written
+LOG_LOCK = threading.Lock()
+
+# buffer of the test run by the current thread, if any, where the DPC debug lines of this test are written
+TEST_OUTPUT = threading.local()
+
+# connections to the filters, kept open for the whole tests session, by (socket_type, socket_path, socket_host,
+# socket_port). Each key has its own lock, held while a test uses the connection
+DARWIN_POOL = {}
+DARWIN_POOL_KEY_LOCKS = {}
+DARWIN_POOL_LOCK = threading.Lock()
+
+# keys of the pool whose connection failed: the following tests on these filters fail at once, instead of trying to
+# connect again
+DARWIN_DEAD_POOL_KEYS = set()
+
+# accepted command line values for booleans
+TRUE_VALUES = frozenset(("yes", "true", "t", "y", "1"))
+FALSE_VALUES = frozenset(("no", "false", "f", "n", "0"))
+
 
 class colors:
     HEADER = '\033[95m'
@@ -34,7 +69,13 @@ class colors:
     UNDERLINE = '\033[4m'
 
 
-def log(function_name, filter_name, message, color=colors.HEADER, is_indent=False):
+# end of every log line, which resets the color
+LOG_SUFFIX = colors.END + "\n"
+
+
+@functools.lru_cache(maxsize=None)
+def log_prefix(function_name, filter_name, color, is_indent):
+    # only a few prefixes exist (one per function, filter, color and indentation): each one is built once
     if is_indent:
         indent = "\t"
 
@@ -42,382 +83,837 @@ def log(function_name, filter_name, message, color=colors.HEADER, is_indent=Fals
         indent = ""
 
     if filter_name is not None:
-        filter_header = "{filter_name} filter: ".format(filter_name=filter_name, )
+        filter_header = f"{filter_name} filter: "
 
     else:
         filter_header = ""
 
-    print(
-        "{color_begin}{module_name}:: {function_name}:: {indent}{filter_header}{message}{color_end}".format(
-            color_begin=color,
-            module_name=MODULE_NAME,
-            function_name=function_name,
-            filter_header=filter_header,
-            message=message,
-            color_end=colors.END,
-            indent=indent,
+    return f"{color}{MODULE_NAME}:: {function_name}:: {indent}{filter_header}"
+
+
+def log(buf, function_name, filter_name, message, *args, color=colors.HEADER, is_indent=False, is_enabled=True):
+    # the line is written to buf, which is either sys.stdout or the buffer of a test. The message is only built when
+    # it is actually displayed: the arguments are substituted lazily, "%s"-style
+    if not is_enabled:
+        return
+
+    if args:
+        message = message % args
+
+    buf.write(log_prefix(function_name, filter_name, color, is_indent) + message + LOG_SUFFIX)
+
+
+class TestOutputHandler(logging.Handler):
+    # writes the records of the "darwin" logger to the buffer of the test run by the current thread, so the DPC debug
+    # lines are grouped with the other lines of their test. Outside of a test, they are written to the standard output
+    def emit(self, record):
+        try:
+            buf = getattr(TEST_OUTPUT, "buf", None)
+
+            if buf is None:
+                with LOG_LOCK:
+                    sys.stdout.write(self.format(record) + "\n")
+
+            else:
+                buf.write(self.format(record) + "\n")
+
+        except Exception:
+            self.handleError(record)
+
+
+class short:
+    # a result whose repr is truncated to max_length characters when displayed. The repr is only computed when the
+    # log line is actually displayed, and never entirely displays huge results
+    __slots__ = ("result", "max_length", )
+
+    def __init__(self, result, max_length=200):
+        self.result = result
+        self.max_length = max_length
+
+    def __str__(self):
+        result_repr = repr(self.result)
+
+        if len(result_repr) <= self.max_length:
+            return result_repr
+
+        return result_repr[:self.max_length] + "..."
+
+
+def first_diff(expected_result, darwin_result):
+    # returns None if both results match, otherwise (index, expected item, Darwin item) for the first difference
+    # only: on a mismatch, large results are neither walked nor displayed entirely. A missing item is given as None.
+    # If the results are not both lists, the index is None and the whole results are given
+    if expected_result == darwin_result:
+        return None
+
+    if not isinstance(expected_result, (list, tuple)) or not isinstance(darwin_result, (list, tuple)):
+        return None, expected_result, darwin_result
+
+    for index, (expected_item, darwin_item) in enumerate(zip(expected_result, darwin_result)):
+        if expected_item != darwin_item:
+            return index, expected_item, darwin_item
+
+    if len(expected_result) != len(darwin_result):
+        index = min(len(expected_result), len(darwin_result))
+
+        return (
+            index,
+            expected_result[index] if index < len(expected_result) else None,
+            darwin_result[index] if index < len(darwin_result) else None,
         )
-    )
 
+    return None
+
+
+def log_result_check(buf, filter_name, function_label, expected_result, darwin_result, debug_mode):
+    # returns True if the Darwin result matches the expected one. On a mismatch, only the first difference is logged
+    diff = first_diff(expected_result, darwin_result)
+
+    if diff is None:
+        log(
+            buf,
+            "test_filter",
+            filter_name,
+            "%s function: expected result matches Darwin: %s",
+            function_label,
+            short(expected_result),
+            color=colors.OKGREEN,
+            is_indent=True,
+            is_enabled=debug_mode,
+        )
+
+        return True
+
+    # the index is None when the results are not lists
+    if diff[0] is None:
+        log(
+            buf,
+            "test_filter",
+            filter_name,
+            "%s function: expected result not matching Darwin: %s != %s",
+            function_label,
+            short(diff[1]),
+            short(diff[2]),
+            color=colors.FAIL,
+            is_indent=True,
+            is_enabled=debug_mode,
+        )
+
+    else:
+        log(
+            buf,
+            "test_filter",
+            filter_name,
+            "%s function: expected result not matching Darwin at index %s: %s != %s",
+            function_label,
+            diff[0],
+            short(diff[1]),
+            short(diff[2]),
+            color=colors.FAIL,
+            is_indent=True,
+            is_enabled=debug_mode,
+        )
+
+    return False
+
+
+class CachedDarwinApi:
+    # wraps a darwin.DarwinApi instance, and memoizes the results of its call and bulk_call methods with the "back"
+    # response type: the same request sent again on the same connection is not sent to Darwin. The other response types
+    # are never cached, as they return a new event ID each time or forward the request to the next filter. Requests
+    # whose arguments are not hashable are not cached either. Any other attribute is the one of the wrapped instance
+    def __init__(self, darwin_api):
+        self.darwin_api = darwin_api
+        self.results = {}
+
+    def __getattr__(self, name):
+        return getattr(self.darwin_api, name)
+
+    def _cached_result(self, function, make_arguments_key, arguments, packet_type, response_type, filter_code, kwargs):
+        if response_type == "back":
+            try:
+                key = (function.__name__, make_arguments_key(arguments), packet_type, filter_code,
+                       tuple(sorted(kwargs.items())), )
+
+                return self.results[key]
+
+            except KeyError:
+                pass
+
+            except TypeError:
+                key = None
+
+        else:
+            key = None
+
+        result = function(arguments, packet_type=packet_type, response_type=response_type, filter_code=filter_code,
+                          **kwargs)
+
+        if key is not None:
+            self.results[key] = result
+
+        return result
+
+    def call(self,
+             arguments,
+             packet_type="other",
+             response_type="no",
+             filter_code=DarwinPacket.DARWIN_FILTER_CODE_NO,
+             **kwargs):
+        return self._cached_result(self.darwin_api.call, tuple, arguments, packet_type, response_type, filter_code,
+                                   kwargs)
+
+    def bulk_call(self,
+                  data,
+                  packet_type="other",
+                  response_type="no",
+                  filter_code=DarwinPacket.DARWIN_FILTER_CODE_NO,
+                  **kwargs):
+        return self._cached_result(self.darwin_api.bulk_call, lambda data: tuple(map(tuple, data)), data, packet_type,
+                                   response_type, filter_code, kwargs)
+
+
+class TestsStopped(Exception):
+    # raised by check_stopped when the tests have to stop, in fail fast mode
+    pass
+
+
+def check_stopped(stop_event):
+    # in fail fast mode, stop_event is set as soon as a test does not pass: the tests still running stop before their
+    # next call to Darwin
+    if stop_event is not None and stop_event.is_set():
+        raise TestsStopped()
+
+
+def get_darwin_api_factory(test_descr):
+    # returns a function opening a connection to the filter of the given test, or None if its socket type is invalid
+    if test_descr.socket_type == "unix":
+        return functools.partial(DarwinApi,
+                                 socket_path=test_descr.socket_path,
+                                 socket_type=test_descr.socket_type,
+                                 timeout=test_descr.timeout,
+                                 verbose=test_descr.verbose, )
+
+    if test_descr.socket_type == "tcp":
+        return functools.partial(DarwinApi,
+                                 socket_host=test_descr.socket_host,
+                                 socket_port=test_descr.socket_port,
+                                 socket_type=test_descr.socket_type,
+                                 timeout=test_descr.timeout,
+                                 tcp_nodelay=True,
+                                 verbose=test_descr.verbose, )
+
+    return None
+
+
+def acquire_darwin_api(pool_key, make_darwin_api):
+    # returns the connection of the pool associated to the given key, and opens it with make_darwin_api (see
+    # get_darwin_api_factory) if needed. The tests run concurrently and a darwin.DarwinApi instance must only be used
+    # by one thread at a time: the connection is reserved to the caller until release_darwin_api is called
+    with DARWIN_POOL_LOCK:
+        pool_key_lock = DARWIN_POOL_KEY_LOCKS.setdefault(pool_key, threading.Lock())
+
+    pool_key_lock.acquire()
 
-def test_filter(filter_name, socket_type=None, socket_path=None, socket_host=None, socket_port=None, filter_code=None,
-                response_type="back", verbose=True, debug_mode=False, display_time=False, **kwargs):
     try:
-        call_args = kwargs.get("call_args", None)
-        bulk_call_args = kwargs.get("bulk_call_args", None)
-        expected_bulk_results = kwargs.get("expected_bulk_results", None)
+        darwin_api = DARWIN_POOL.get(pool_key, None)
 
-        # expected_call_result could REALLY be None, so we have to make the distinction
-        try:
-            expected_call_result = kwargs["expected_call_result"]
-            is_expected_call_result = True
-        except KeyError:
-            expected_call_result = None
-            is_expected_call_result = False
+        if darwin_api is None:
+            if pool_key in DARWIN_DEAD_POOL_KEYS:
+                raise DarwinConnectionError("a previous connection to this filter failed")
 
-        if debug_mode:
+            try:
+                darwin_api = CachedDarwinApi(make_darwin_api())
+
+            except DarwinConnectionError:
+                DARWIN_DEAD_POOL_KEYS.add(pool_key)
+                raise
+
+            DARWIN_POOL[pool_key] = darwin_api
+
+    except BaseException:
+        pool_key_lock.release()
+        raise
+
+    return darwin_api
+
+
+def release_darwin_api(pool_key, is_broken=False):
+    # gives the connection back to the pool. A broken connection (e.g. after an error during a call) may be left in an
+    # unknown state: it is closed, and the next test will open a new one
+    if is_broken:
+        DARWIN_POOL.pop(pool_key).close()
+
+    DARWIN_POOL_KEY_LOCKS[pool_key].release()
+
+
+def close_darwin_apis():
+    for darwin_api in DARWIN_POOL.values():
+        darwin_api.close()
+
+    DARWIN_POOL.clear()
+
+
+def test_filter(test_descr, make_darwin_api, quiet=False, stop_event=None):
+    # returns True if the tests passed, False otherwise, and None if they were skipped or if the filter is not running.
+    # In fail fast mode, stop_event is given: it is set when the tests do not pass, and the other tests are then
+    # skipped before their next call.
+    # The tests are run concurrently: the output of each test is buffered, then written at once when it ends, so the
+    # lines of the different tests are not interleaved
+    buf = io.StringIO()
+    is_ok = False
+    TEST_OUTPUT.buf = buf
+
+    try:
+        is_ok = _test_filter(buf, test_descr, make_darwin_api, quiet, stop_event)
+
+    finally:
+        TEST_OUTPUT.buf = None
+
+        if is_ok is False and stop_event is not None:
+            stop_event.set()
+
+        output = buf.getvalue()
+
+        # in quiet mode, a successful test does not display anything
+        if output:
+            with LOG_LOCK:
+                sys.stdout.write(output)
+                sys.stdout.flush()
+
+    return is_ok
+
+
+def _test_filter(buf, test_descr, make_darwin_api, quiet, stop_event):
+    filter_name = test_descr.filter_name
+    filter_code = test_descr.filter_code
+    response_type = test_descr.response_type
+    debug_mode = test_descr.debug_mode
+    display_time = test_descr.display_time
+
+    # tests on the same filter share the same connection
+    pool_key = (test_descr.socket_type, test_descr.socket_path, test_descr.socket_host, test_descr.socket_port, )
+    darwin_api = None
+
+    # the time performance lines are kept aside, and only written with the result line of the test: in quiet mode, a
+    # successful test does not display them either
+    time_buf = io.StringIO()
+
+    try:
+        call_args = test_descr.call_args
+        bulk_call_args = test_descr.bulk_call_args
+        expected_call_result = test_descr.expected_call_result
+        expected_bulk_results = test_descr.expected_bulk_results
+        is_expected_call_result = expected_call_result is not MISSING
+
+        log(
+            buf,
+            "test_filter",
+            filter_name,
+            "tests will begin",
+            color=colors.OKBLUE,
+            is_enabled=debug_mode,
+        )
+
+        # if not filter code is provided, we try to get it from the filter name
+        if filter_code is None:
             log(
+                buf,
                 "test_filter",
                 filter_name,
-                "tests will begin",
-                color=colors.OKBLUE,
+                "no filter code provided, so it will be extracted from the filter name \"%s\"",
+                filter_name,
+                color=colors.WARNING,
+                is_indent=True,
+                is_enabled=debug_mode,
             )
 
-        # if not filter code is provided, we try to get it from the filter name
-        if filter_code is None:
-            if debug_mode:
-                log(
-                    "test_filter",
-                    filter_name,
-                    "no filter code provided, so it will be extracted from the filter name \"{filter_name}\"",
-                    color=colors.WARNING,
-                    is_indent=True,
-                )
-
             filter_code = filter_name
 
-        try:
-            if socket_type == "unix":
-                darwin_api = DarwinApi(socket_path=socket_path,
-                                       socket_type=socket_type,
-                                       verbose=verbose, )
-
-            elif socket_type == "tcp":
-                darwin_api = DarwinApi(socket_host=socket_host,
-                                       socket_port=socket_port,
-                                       socket_type=socket_type,
-                                       verbose=verbose, )
+        check_stopped(stop_event)
 
-            else:
-                if debug_mode:
-                    log(
-                        "test_filter",
-                        filter_name,
-                        "Invalid socket type provided: \"{socket_type}\"".format(socket_type=socket_type),
-                        color=colors.FAIL,
-                        is_indent=True,
-                    )
-
-                log(
-                    "test_filter",
-                    filter_name,
-                    "[NOT OK]",
-                    color=colors.FAIL,
-                    is_indent=True,
-                )
-
-                return
+        try:
+            darwin_api = acquire_darwin_api(pool_key, make_darwin_api)
 
         except DarwinConnectionError:
-            if debug_mode:
-                log(
-                    "test_filter",
-                    filter_name,
-                    "the filter does not appear to be running",
-                    color=colors.WARNING,
-                    is_indent=True,
-                )
+            log(
+                buf,
+                "test_filter",
+                filter_name,
+                "the filter does not appear to be running",
+                color=colors.WARNING,
+                is_indent=True,
+                is_enabled=debug_mode,
+            )
 
             log(
+                buf,
                 "test_filter",
                 filter_name,
                 "[NOT RUNNING]",
                 color=colors.WARNING,
             )
 
-            return
+            # a filter which is not deployed is only a warning: the other tests go on, and the run does not fail
+            return None
+
+        # the connection may have been waited for while another test failed
+        check_stopped(stop_event)
+
+        # a cached result would be timed as a dict lookup: the timed calls are always sent to Darwin
+        if display_time:
+            darwin_calls = darwin_api.darwin_api
+
+        else:
+            darwin_calls = darwin_api
 
         is_ok = True
 
-        if call_args is not None:
-            if debug_mode:
-                log(
-                    "test_filter",
-                    filter_name,
-                    "calling call function",
-                    color=colors.HEADER,
-                    is_indent=True,
-                )
+        # when both are given, call_args and bulk_call_args are sent in a single bulk_call, so a single round trip is
+        # needed. The first certitude is then the call result, and the following ones the bulk_call results
+        is_merged = call_args is not None and bulk_call_args is not None and response_type in ("back", "both", )
+
+        if is_merged:
+            check_stopped(stop_event)
+
+            log(
+                buf,
+                "test_filter",
+                filter_name,
+                "calling bulk_call function for both call_args and bulk_call_args",
+                color=colors.HEADER,
+                is_indent=True,
+                is_enabled=debug_mode,
+            )
 
             if display_time:
-                start = time.time()
+                start = perf_counter_ns()
 
-            darwin_result = darwin_api.call(
-                call_args,
+            merged_results = darwin_calls.bulk_call(
+                [call_args] + list(bulk_call_args),
                 filter_code=filter_code,
                 response_type=response_type,
-            )
+            )["certitude_list"]
 
             if display_time:
-                end = time.time()
+                end = perf_counter_ns()
 
                 log(
+                    time_buf,
                     "test_filter",
                     filter_name,
-                    "call function: took {duration} ms".format(
-                        duration=(end - start) * 1000,
-                    ),
+                    "call and bulk_call functions: took %s ms",
+                    (end - start) / 1e6,
                     color=colors.OKBLUE,
                 )
 
-            if is_expected_call_result:
-                if expected_call_result != darwin_result:
-                    if debug_mode:
-                        log(
-                            "test_filter",
-                            filter_name,
-                            "call function: expected result not matching Darwin: "
-                            "{expected_result} != {darwin_result}".format(
-                                expected_result=expected_call_result, darwin_result=darwin_result,
-                            ),
-                            color=colors.FAIL,
-                            is_indent=True,
-                        )
-
-                    is_ok = False
-
-                else:
-                    if debug_mode:
-                        log(
-                            "test_filter",
-                            filter_name,
-                            "call function: expected result matches Darwin: {expected_result}".format(
-                                expected_result=expected_call_result,
-                            ),
-                            color=colors.OKGREEN,
-                            is_indent=True,
-                        )
+        if call_args is not None:
+            if is_merged:
+                darwin_result = merged_results[0] if merged_results else None
 
             else:
-                if debug_mode:
-                    log(
-                        "test_filter",
-                        filter_name,
-                        "call function: expected_call_result is not provided: "
-                        "nothing to check. Darwin result obtained: {darwin_result}".format(
-                            darwin_result=darwin_result,
-                        ),
-                        color=colors.OKGREEN,
-                        is_indent=True,
-                    )
+                check_stopped(stop_event)
 
-            if debug_mode:
                 log(
+                    buf,
                     "test_filter",
                     filter_name,
-                    "call function ended",
-                    color=colors.OKBLUE,
+                    "calling call function",
+                    color=colors.HEADER,
                     is_indent=True,
+                    is_enabled=debug_mode,
                 )
 
-        else:
-            if debug_mode:
-                log(
-                    "test_filter",
-                    filter_name,
-                    "call_args is None: nothing to do".format(
-                        expected_result=expected_call_result,
-                    ),
-                    color=colors.HEADER,
-                    is_indent=True,
+                if display_time:
+                    start = perf_counter_ns()
+
+                darwin_result = darwin_calls.call(
+                    call_args,
+                    filter_code=filter_code,
+                    response_type=response_type,
                 )
 
-        if bulk_call_args is not None:
-            if debug_mode:
+                if display_time:
+                    end = perf_counter_ns()
+
+                    log(
+                        time_buf,
+                        "test_filter",
+                        filter_name,
+                        "call function: took %s ms",
+                        (end - start) / 1e6,
+                        color=colors.OKBLUE,
+                    )
+
+            if is_expected_call_result:
+                if not log_result_check(
+                    buf,
+                    filter_name,
+                    "call",
+                    expected_call_result,
+                    darwin_result,
+                    debug_mode,
+                ):
+                    is_ok = False
+
+            else:
                 log(
+                    buf,
                     "test_filter",
                     filter_name,
-                    "calling bulk_call function".format(
-                        expected_result=expected_call_result,
-                    ),
-                    color=colors.HEADER,
+                    "call function: expected_call_result is not provided: "
+                    "nothing to check. Darwin result obtained: %s",
+                    short(darwin_result),
+                    color=colors.OKGREEN,
                     is_indent=True,
+                    is_enabled=debug_mode,
                 )
 
-            if display_time:
-                start = time.time()
+            log(
+                buf,
+                "test_filter",
+                filter_name,
+                "call function ended",
+                color=colors.OKBLUE,
+                is_indent=True,
+                is_enabled=debug_mode,
+            )
 
-            darwin_result = darwin_api.bulk_call(
-                bulk_call_args,
-                filter_code=filter_code,
-                response_type=response_type,
+        else:
+            log(
+                buf,
+                "test_filter",
+                filter_name,
+                "call_args is None: nothing to do",
+                color=colors.HEADER,
+                is_indent=True,
+                is_enabled=debug_mode,
             )
 
-            if display_time:
-                end = time.time()
+        if bulk_call_args is not None:
+            if is_merged:
+                darwin_result = tuple(merged_results[1:])
+
+            else:
+                check_stopped(stop_event)
 
                 log(
+                    buf,
                     "test_filter",
                     filter_name,
-                    "bulk_call function: took {duration} ms".format(
-                        duration=(end - start) * 1000,
-                    ),
-                    color=colors.OKBLUE,
+                    "calling bulk_call function",
+                    color=colors.HEADER,
+                    is_indent=True,
+                    is_enabled=debug_mode,
                 )
 
-            if isinstance(darwin_result, dict):
-                darwin_result = darwin_result["certitude_list"]
-
-            if expected_bulk_results is not None:
-                if expected_bulk_results != darwin_result:
-                    if debug_mode:
-                        log(
-                            "test_filter",
-                            filter_name,
-                            "bulk_call function: "
-                            "expected result not matching Darwin: {expected_result} != {darwin_result}".format(
-                                expected_result=expected_bulk_results,
-                                darwin_result=darwin_result,
-                            ),
-                            color=colors.FAIL,
-                            is_indent=True,
-                        )
+                if display_time:
+                    start = perf_counter_ns()
 
-                    is_ok = False
+                darwin_result = darwin_calls.bulk_call(
+                    bulk_call_args,
+                    filter_code=filter_code,
+                    response_type=response_type,
+                )
 
-                else:
-                    if debug_mode:
-                        log(
-                            "test_filter",
-                            filter_name,
-                            "bulk_call function: "
-                            "expected result matches Darwin: {expected_result}".format(
-                                expected_result=expected_bulk_results,
-                            ),
-                            color=colors.OKGREEN,
-                            is_indent=True,
-                        )
+                if display_time:
+                    end = perf_counter_ns()
 
-            else:
-                if debug_mode:
                     log(
+                        time_buf,
                         "test_filter",
                         filter_name,
-                        "bulk_call function: "
-                        "expected_bulk_results is None: nothing to check. "
-                        "Darwin result obtained: {darwin_result}".format(
-                            darwin_result=darwin_result,
-                        ),
-                        color=colors.OKGREEN,
-                        is_indent=True,
+                        "bulk_call function: took %s ms",
+                        (end - start) / 1e6,
+                        color=colors.OKBLUE,
                     )
 
-            if debug_mode:
+            # the expected results are given as tuples: converting the certitudes once lets them be compared at once
+            if isinstance(darwin_result, dict):
+                darwin_result = tuple(darwin_result["certitude_list"])
+
+            if expected_bulk_results is not None:
+                if not log_result_check(
+                    buf,
+                    filter_name,
+                    "bulk_call",
+                    expected_bulk_results,
+                    darwin_result,
+                    debug_mode,
+                ):
+                    is_ok = False
+
+            else:
                 log(
+                    buf,
                     "test_filter",
                     filter_name,
-                    "bulk_call function ended",
-                    color=colors.HEADER,
+                    "bulk_call function: expected_bulk_results is None: nothing to check. "
+                    "Darwin result obtained: %s",
+                    short(darwin_result),
+                    color=colors.OKGREEN,
                     is_indent=True,
+                    is_enabled=debug_mode,
                 )
 
+            log(
+                buf,
+                "test_filter",
+                filter_name,
+                "bulk_call function ended",
+                color=colors.HEADER,
+                is_indent=True,
+                is_enabled=debug_mode,
+            )
+
         else:
-            if debug_mode:
+            log(
+                buf,
+                "test_filter",
+                filter_name,
+                "bulk_call_args is None: nothing to do",
+                color=colors.HEADER,
+                is_indent=True,
+                is_enabled=debug_mode,
+            )
+
+        # the bulk_call requests are also sent one by one, pipelined: each one must get the same result
+        if bulk_call_args is not None and expected_bulk_results is not None and response_type in ("back", "both", ):
+            check_stopped(stop_event)
+
+            log(
+                buf,
+                "test_filter",
+                filter_name,
+                "calling pipeline_call function",
+                color=colors.HEADER,
+                is_indent=True,
+                is_enabled=debug_mode,
+            )
+
+            if isinstance(filter_code, str):
+                pipeline_filter_code = DarwinApi.get_filter_code(filter_code)
+
+            else:
+                pipeline_filter_code = filter_code
+
+            if display_time:
+                start = perf_counter_ns()
+
+            # the headers are given as is, so they all share the default event ID: the responses are then bound to
+            # their request in order
+            darwin_results = darwin_calls.pipeline_call([
+                {
+                    "header": DarwinPacket(
+                        packet_type="other",
+                        response_type=response_type,
+                        filter_code=pipeline_filter_code,
+                    ),
+                    "data": [arguments, ],
+                }
+                for arguments in bulk_call_args
+            ])
+
+            if display_time:
+                end = perf_counter_ns()
+
                 log(
+                    time_buf,
                     "test_filter",
                     filter_name,
-                    "bulk_call_args is None: nothing to do",
-                    color=colors.HEADER,
-                    is_indent=True,
+                    "pipeline_call function: took %s ms",
+                    (end - start) / 1e6,
+                    color=colors.OKBLUE,
                 )
 
-        darwin_api.close()
+            darwin_result = tuple(
+                certitude
+                for darwin_result in darwin_results
+                for certitude in darwin_result["certitude_list"]
+            )
 
-        if debug_mode:
-            log(
-                "test_filter",
+            if not log_result_check(
+                buf,
                 filter_name,
-                "tests are finished",
-                color=colors.OKBLUE,
-            )
+                "pipeline_call",
+                expected_bulk_results,
+                darwin_result,
+                debug_mode,
+            ):
+                is_ok = False
+
+        release_darwin_api(pool_key)
+        darwin_api = None
+
+        log(
+            buf,
+            "test_filter",
+            filter_name,
+            "tests are finished",
+            color=colors.OKBLUE,
+            is_enabled=debug_mode,
+        )
 
         if is_ok:
+            if not quiet:
+                buf.write(time_buf.getvalue())
+
             log(
+                buf,
                 "test_filter",
                 filter_name,
                 "[OK]",
                 color=colors.OKGREEN,
+                is_enabled=not quiet,
             )
 
         else:
+            buf.write(time_buf.getvalue())
+
             log(
+                buf,
                 "test_filter",
                 filter_name,
                 "[NOT OK]",
                 color=colors.FAIL,
             )
 
+        return is_ok
+
+    except TestsStopped:
+        # the connection is left in a clean state, between two calls
+        if darwin_api is not None:
+            release_darwin_api(pool_key)
+
+        buf.write(time_buf.getvalue())
+
+        log(
+            buf,
+            "test_filter",
+            filter_name,
+            "[SKIPPED]",
+            color=colors.WARNING,
+        )
+
+        return None
+
     except Exception as error:
-        darwin_api.close()
+        if darwin_api is not None:
+            release_darwin_api(pool_key, is_broken=True)
+
+        buf.write(time_buf.getvalue())
 
         log(
+            buf,
             "test_filter",
             filter_name,
-            "[ERROR] {error}".format(error=error, ),
+            "[ERROR] %s",
+            error,
             color=colors.FAIL,
         )
 
         if debug_mode:
             raise
 
+        return False
+
 
-def run_tests(tests_descr, debug_mode=False, display_time=False):
-    if debug_mode:
-        log(
-            "run_tests",
-            None,
-            "beginning tests...",
-            color=colors.HEADER,
+def run_tests(tests_descr, debug_mode=False, display_time=False, quiet=False, fail_fast=False):
+    # returns True if no test failed: the tests whose filter is not running are not failures. In fail fast mode, the
+    # tests stop at the first one which does not pass
+    log(
+        sys.stdout,
+        "run_tests",
+        None,
+        "beginning tests...",
+        color=colors.HEADER,
+        is_enabled=debug_mode,
+    )
+
+    tests_descr = [
+        dataclasses.replace(
+            test_descr,
+            # by default, the debug mode is set globally
+            debug_mode=debug_mode if test_descr.debug_mode is None else test_descr.debug_mode,
+            # by default, the display time mode is set globally
+            display_time=display_time if test_descr.display_time is None else test_descr.display_time,
         )
+        for test_descr in tests_descr
+    ]
+
+    # the descriptions are checked before running any test
+    valid_tests_descr = []
+    darwin_api_factories = []
 
     for test_descr in tests_descr:
-        # by default, the debug mode is set globally
-        if "debug_mode" not in test_descr:
-            test_descr["debug_mode"] = debug_mode
+        make_darwin_api = get_darwin_api_factory(test_descr)
 
-        # by default, the display time mode is set globally
-        if "display_time" not in test_descr:
-            test_descr["display_time"] = display_time
+        if make_darwin_api is None:
+            log(
+                sys.stdout,
+                "test_filter",
+                test_descr.filter_name,
+                "Invalid socket type provided: \"%s\"",
+                test_descr.socket_type,
+                color=colors.FAIL,
+                is_indent=True,
+                is_enabled=test_descr.debug_mode,
+            )
 
-        test_filter(**test_descr)
+            log(
+                sys.stdout,
+                "test_filter",
+                test_descr.filter_name,
+                "[NOT OK]",
+                color=colors.FAIL,
+                is_indent=True,
+            )
 
-    if debug_mode:
-        log(
-            "run_tests",
-            None,
-            "test ended",
-            color=colors.HEADER,
-        )
+            if fail_fast:
+                return False
+
+            continue
+
+        valid_tests_descr.append(test_descr)
+        darwin_api_factories.append(make_darwin_api)
+
+    # the filters are independent and the tests mostly wait for Darwin: they are run concurrently, as the socket
+    # operations release the GIL
+    if fail_fast:
+        stop_event = threading.Event()
+
+    else:
+        stop_event = None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(valid_tests_descr)))) as executor:
+        results = list(executor.map(
+            functools.partial(test_filter, quiet=quiet, stop_event=stop_event),
+            valid_tests_descr,
+            darwin_api_factories,
+        ))
+
+    log(
+        sys.stdout,
+        "run_tests",
+        None,
+        "test ended",
+        color=colors.HEADER,
+        is_enabled=debug_mode,
+    )
+
+    return len(valid_tests_descr) == len(tests_descr) and all(result is not False for result in results)
 
 
 def str_to_bool(value):
     if isinstance(value, bool):
         return value
 
-    if value.lower() in ("yes", "true", "t", "y", "1"):
+    value = value.lower()
+
+    if value in TRUE_VALUES:
         return True
 
-    elif value.lower() in ("no", "false", "f", "n", "0"):
+    elif value in FALSE_VALUES:
         return False
 
     else:
@@ -425,13 +921,6 @@ def str_to_bool(value):
 
 
 if __name__ == "__main__":
-    log(
-        "__main__",
-        None,
-        "tests will be run on Darwin filters",
-        color=colors.HEADER,
-    )
-
     parser = argparse.ArgumentParser(description="Test Darwin filters.")
 
     parser.add_argument(
@@ -454,6 +943,46 @@ if __name__ == "__main__":
         help="Display time performance. Default is false"
     )
 
+    parser.add_argument(
+        "-q",
+        "--quiet",
+        type=str_to_bool,
+        nargs='?',
+        const=True,
+        default=False,
+        help="Only display the tests which failed, or whose filter is not running. Default is false"
+    )
+
+    parser.add_argument(
+        "-f",
+        "--fail-fast",
+        type=str_to_bool,
+        nargs='?',
+        const=True,
+        default=False,
+        help="Stop at the first test which does not pass: the other tests are skipped. Default is false"
+    )
+
     args = parser.parse_args()
 
-    run_tests(TESTS_DESCR, debug_mode=args.debug, display_time=args.time, )
+    # the DPC debug lines of the tests in verbose mode are displayed with the output of their test
+    darwin_logger = logging.getLogger("darwin")
+    darwin_logger.addHandler(TestOutputHandler())
+    darwin_logger.setLevel(logging.DEBUG)
+    darwin_logger.propagate = False
+
+    log(
+        sys.stdout,
+        "__main__",
+        None,
+        "tests will be run on Darwin filters",
+        color=colors.HEADER,
+        is_enabled=not args.quiet,
+    )
+
+    atexit.register(close_darwin_apis)
+
+    is_ok = run_tests(TESTS_DESCR, debug_mode=args.debug, display_time=args.time, quiet=args.quiet,
+                      fail_fast=args.fail_fast, )
+
+    sys.exit(0 if is_ok else 1)
@@ -9,31 +9,67 @@ __license__ = "GPLv3"
 __copyright__ = "Copyright (c) 2019 Advens. All rights reserved."
 
 
+# system imports
+from dataclasses import dataclass
+from typing import Any, List, Optional, Union
+
+# Darwin imports
+from darwin import DarwinApi
+
+
+# default value of TestDescr.expected_call_result: the expected result could REALLY be None, so we have to make the
+# distinction
+MISSING = object()
+
+
+# description of the tests to run on a filter: see README.md for the details of each field
+@dataclass(frozen=True)
+class TestDescr:
+    filter_name: str
+    socket_type: str
+    socket_path: Optional[str] = None
+    socket_host: Optional[str] = None
+    socket_port: Optional[int] = None
+    filter_code: Union[int, str, None] = None
+    response_type: str = "back"
+    timeout: Optional[float] = DarwinApi.DEFAULT_TIMEOUT
+    verbose: bool = True
+    call_args: Optional[list] = None
+    bulk_call_args: Optional[List[list]] = None
+    expected_call_result: Any = MISSING
+    expected_bulk_results: Optional[tuple] = None
+    # if None, the global modes are used
+    debug_mode: Optional[bool] = None
+    display_time: Optional[bool] = None
+
+
 TESTS_DESCR = [
-    {  # DGA filter
-        "filter_name": "DGA",
-        "socket_path": "/var/sockets/darwin/dga_1.sock",
-        "socket_type": "unix",
-        "filter_code": "DGA",
-        "verbose": False,
-        "call_args": ["example.com", ],
-        "bulk_call_args": [
+    # DGA filter
+    TestDescr(
+        filter_name="DGA",
+        socket_path="/var/sockets/darwin/dga_1.sock",
+        socket_type="unix",
+        filter_code="DGA",
+        verbose=False,
+        call_args=["example.com", ],
+        bulk_call_args=[
             ["example.com", ],
             ["google.com", ],
             ["drive.google.com", ],
         ],
         # since the probability is returned, it is safer to provide only safe domain names
-        "expected_call_result": 0,
-        "expected_bulk_results": [0, 0, 0, ],
-    },
-    {  # User agent filter
-        "filter_name": "USER_AGENT",
-        "socket_path": "/var/sockets/darwin/user_agent_1.sock",
-        "socket_type": "unix",
-        "filter_code": "UserAgent",
-        "verbose": False,
-        "call_args": ["Opera/9.60 (Windows NT 6.0; U; en) Presto/2.1.1", ],
-        "bulk_call_args": [
+        expected_call_result=0,
+        expected_bulk_results=(0, 0, 0, ),
+    ),
+    # User agent filter
+    TestDescr(
+        filter_name="USER_AGENT",
+        socket_path="/var/sockets/darwin/user_agent_1.sock",
+        socket_type="unix",
+        filter_code="UserAgent",
+        verbose=False,
+        call_args=["Opera/9.60 (Windows NT 6.0; U; en) Presto/2.1.1", ],
+        bulk_call_args=[
             ["Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
              "Chrome/51.0.2704.103 Safari/537.36", ],
             ["Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
@@ -41,7 +77,7 @@ TESTS_DESCR = [
             ["Opera/9.60 (Windows NT 6.0; U; en) Presto/2.1.1", ],
         ],
         # since the probability is returned, it is safer to provide only safe user agents
-        "expected_call_result": 0,
-        "expected_bulk_results": [0, 0, 0, ],
-    },
+        expected_call_result=0,
+        expected_bulk_results=(0, 0, 0, ),
+    ),
 ]